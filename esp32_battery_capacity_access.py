@@ -17,28 +17,129 @@ The simplified backup table structure:
     - ratedCapacity: 50.0 // Current battery capacity in Ah (Lead Acid)
 """
 
-import os
 import time
-from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, db
+import atexit
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+import requests
+
+from firebase_client import DATABASE_URL, get_app, get_db_ref
+
+# Ports present on the charger hardware (see table layout above).
+KNOWN_PORT_IDS = ('port_1', 'port_2', 'port_3', 'port_4')
+LEAD_ACID_PORTS = frozenset({'port_4'})
+
+# Pooled session for raw REST calls that the admin SDK has no API for
+# (e.g. shallow queries).
+_rest_session = requests.Session()
+
+# Capacity cache: the whole backup table is small, so keep it in memory and
+# serve per-port lookups from there instead of paying one round-trip per port.
+# While the streaming listener is running the server pushes deltas into the
+# cache over a single persistent connection, so reads are free; the TTL only
+# applies when the listener could not be started.
+CAPACITY_CACHE_TTL_SECONDS = 60
+_capacity_cache = None
+_cache_ts = 0
+_capacity_listener = None
+
+
+def _merge_into(node, delta):
+    """Recursively merge a patch delta into a cache node; None deletes a key."""
+    for key, value in delta.items():
+        if value is None:
+            node.pop(key, None)
+        elif isinstance(value, dict) and isinstance(node.get(key), dict):
+            _merge_into(node[key], value)
+        else:
+            node[key] = value
+
+
+def _on_capacity_event(event):
+    """Apply a streamed change from /batteryCapacityBackup to the cache.
+
+    'put' events replace the node at event.path wholesale; 'patch' events
+    carry a delta dict whose keys must be merged into that node — a patch at
+    '/' updates only the ports it names and leaves the rest of the cache
+    intact.
+    """
+    global _capacity_cache, _cache_ts
+    if _capacity_cache is None:
+        _capacity_cache = {}
+    keys = [k for k in event.path.strip('/').split('/') if k]
+    node = _capacity_cache
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    if event.event_type == 'patch':
+        if keys:
+            target = node.setdefault(keys[-1], {})
+            if not isinstance(target, dict):
+                target = node[keys[-1]] = {}
+        else:
+            target = node
+        _merge_into(target, event.data or {})
+    elif not keys:
+        # Initial snapshot (or a root-level overwrite).
+        _capacity_cache = event.data or {}
+    elif event.data is None:
+        node.pop(keys[-1], None)
+    else:
+        node[keys[-1]] = event.data
+    _cache_ts = time.time()
+
+
+def _start_capacity_listener():
+    """Start the persistent stream on the backup table and hook up teardown."""
+    global _capacity_listener
+    if _capacity_listener is not None:
+        return
+    _capacity_listener = get_db_ref('batteryCapacityBackup').listen(_on_capacity_event)
+    atexit.register(_capacity_listener.close)
+
+
+def _get_capacity_snapshot():
+    """Return the cached backup table, refetching it when the TTL expires."""
+    global _capacity_cache, _cache_ts
+    if _capacity_listener is not None and _capacity_cache is not None:
+        return _capacity_cache
+    # Either no listener, or the listener is registered but its initial
+    # snapshot hasn't arrived yet — fall back to a blocking fetch so early
+    # callers don't see an empty table.
+    if _capacity_cache is None or time.time() - _cache_ts > CAPACITY_CACHE_TTL_SECONDS:
+        _capacity_cache = get_db_ref('batteryCapacityBackup').get() or {}
+        _cache_ts = time.time()
+    return _capacity_cache
+
+def _fetch_capacities_per_port():
+    """
+    Fallback when the root-level fetch returns nothing: read each known port
+    concurrently so K ports cost ~1 round-trip instead of K. firebase_admin's
+    REST transport is thread-safe, so the workers share the one app.
+
+    The result is stored back into the capacity cache so subsequent lookups
+    within the TTL are served from memory instead of repeating the fan-out.
+    """
+    global _capacity_cache, _cache_ts
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        snapshots = executor.map(
+            lambda port_id: get_db_ref(f'batteryCapacityBackup/{port_id}').get(),
+            KNOWN_PORT_IDS
+        )
+    result = {port_id: snap for port_id, snap in zip(KNOWN_PORT_IDS, snapshots) if snap}
+    _capacity_cache = result
+    _cache_ts = time.time()
+    return result
 
-# Firebase configuration
-SERVICE_ACCOUNT_KEY_PATH = 'serviceAccountKey.json'
-DATABASE_URL = os.getenv('NEXT_PUBLIC_FIREBASE_DATABASE_URL')
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK"""
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': DATABASE_URL
-            })
+        get_app()
         print("✅ Firebase initialized successfully")
+        # One persistent stream replaces repeated polling: the server pushes
+        # capacity changes into the local cache, so lookups never block.
+        _start_capacity_listener()
         return True
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
@@ -55,9 +156,8 @@ def get_battery_capacity(port_id):
         float: Battery capacity in Ah or None if not found
     """
     try:
-        backup_ref = db.reference(f'batteryCapacityBackup/{port_id}')
-        snapshot = backup_ref.get()
-        
+        snapshot = _get_capacity_snapshot().get(port_id)
+
         if snapshot and 'ratedCapacity' in snapshot:
             capacity = snapshot['ratedCapacity']
             print(f"✅ Found battery capacity for {port_id}: {capacity} Ah")
@@ -70,59 +170,106 @@ def get_battery_capacity(port_id):
         print(f"❌ Error getting battery capacity: {e}")
         return None
 
-def get_all_port_capacities():
-    """Get battery capacity data for all ports"""
+def _fetch_port_keys():
+    """
+    Fetch just the port names under the backup table via the REST
+    `shallow=true` query — the payload is the key set only, no subtrees.
+    """
+    token = get_app().credential.get_access_token().access_token
+    response = _rest_session.get(
+        f'{DATABASE_URL}/batteryCapacityBackup.json',
+        params={'shallow': 'true'},
+        headers={'Authorization': f'Bearer {token}'},
+        timeout=10
+    )
+    response.raise_for_status()
+    return sorted((response.json() or {}).keys())
+
+def get_all_port_capacities(names_only=False):
+    """
+    Get battery capacity data for all ports.
+
+    With names_only=True, returns just the list of port IDs via a shallow
+    REST query — much smaller payload when the caller only needs to know
+    which ports exist.
+    """
+    if names_only:
+        try:
+            return _fetch_port_keys()
+        except Exception as e:
+            print(f"❌ Error getting port names: {e}")
+            return []
+
     try:
-        backup_ref = db.reference('batteryCapacityBackup')
-        snapshot = backup_ref.get()
-        
+        snapshot = _get_capacity_snapshot()
+
+        if not snapshot:
+            # Root fetch came back empty; try the concurrent per-port reads
+            # before giving up.
+            snapshot = _fetch_capacities_per_port()
+
         if not snapshot:
             print("⚠️ No backup capacity data found")
             return {}
         
+        # Parse in a single comprehension, then print in a second pass so the
+        # extraction itself stays branch-free.
+        all_capacities = {
+            port_id: port_data['ratedCapacity']
+            for port_id, port_data in snapshot.items()
+            if isinstance(port_data, dict) and 'ratedCapacity' in port_data
+        }
+
         print("\n📋 Current Battery Capacity Status:")
         print("-" * 40)
-        
-        all_capacities = {}
-        for port_id, port_data in snapshot.items():
-            if isinstance(port_data, dict) and 'ratedCapacity' in port_data:
-                capacity = port_data['ratedCapacity']
-                all_capacities[port_id] = capacity
-                
-                if capacity > 0:
-                    print(f"🟢 {port_id}: {capacity} Ah")
-                else:
-                    print(f"⚫ {port_id}: No battery connected")
-            else:
+
+        for port_id in snapshot:
+            if port_id not in all_capacities:
                 print(f"⚠️ {port_id}: Invalid data format")
-        
+            elif all_capacities[port_id] > 0:
+                print(f"🟢 {port_id}: {all_capacities[port_id]} Ah")
+            else:
+                print(f"⚫ {port_id}: No battery connected")
+
         return all_capacities
         
     except Exception as e:
         print(f"❌ Error getting all port capacities: {e}")
         return {}
 
+# The simulated ESP32 always checks this port (a real one would know its
+# assigned port from provisioning).
+ESP32_PORT = "port_1"
+
+
+@lru_cache(maxsize=8)
+def _esp32_report(capacity):
+    """
+    Render the derived-figures report for a capacity value. The math and
+    formatting only depend on the capacity, which rarely changes, so the
+    rendered string is cached and a repeat boot-check is a dict hit.
+    """
+    return (
+        "\n🔋 ESP32 can now use this data:\n"
+        f"   - Rated Capacity: {capacity} Ah\n"
+        f"   - Port ID: {ESP32_PORT}\n"
+        "\n📊 ESP32 Calculations:\n"
+        f"   - Max discharge time estimate: {capacity * 3600 / 1000:.1f} seconds at 1A\n"
+        f"   - Energy capacity: {capacity * 3.7:.2f} Wh (assuming 3.7V nominal)"
+    )
+
+
 def simulate_esp32_access():
     """Simulate how an ESP32 would access battery capacity data"""
     print("\n🤖 ESP32 Access Simulation")
     print("=" * 50)
-    
-    # Simulate ESP32 checking its assigned port
-    esp32_port = "port_1"  # ESP32 would know its assigned port
-    
-    print(f"ESP32 checking battery capacity for {esp32_port}...")
-    
-    capacity = get_battery_capacity(esp32_port)
-    
+
+    print(f"ESP32 checking battery capacity for {ESP32_PORT}...")
+
+    capacity = get_battery_capacity(ESP32_PORT)
+
     if capacity and capacity > 0:
-        print(f"\n🔋 ESP32 can now use this data:")
-        print(f"   - Rated Capacity: {capacity} Ah")
-        print(f"   - Port ID: {esp32_port}")
-        
-        # Simulate ESP32 calculations
-        print(f"\n📊 ESP32 Calculations:")
-        print(f"   - Max discharge time estimate: {capacity * 3600 / 1000:.1f} seconds at 1A")
-        print(f"   - Energy capacity: {capacity * 3.7:.2f} Wh (assuming 3.7V nominal)")
+        print(_esp32_report(capacity))
     else:
         print("❌ ESP32 cannot find battery capacity data")
 
@@ -151,7 +298,7 @@ def main():
     print("   Port 4: Lead Acid batteries (1.0 - 200 Ah typical)")
     print("\n📊 Current Capacities:")
     for port_id, capacity in all_capacities.items():
-        battery_type = "Lead Acid" if port_id == "port_4" else "LiPo/Li-ion"
+        battery_type = "Lead Acid" if port_id in LEAD_ACID_PORTS else "LiPo/Li-ion"
         print(f"   {port_id}: {capacity} Ah ({battery_type})")
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared Firebase Admin SDK initialization.
+
+Every helper script used to parse serviceAccountKey.json and call
+initialize_app on its own. The admin SDK keeps a connection pool per app, so
+initializing once and sharing the app avoids redundant credential parsing,
+JWT signing and channel setup. Import get_app()/get_db_ref() instead of
+calling firebase_admin.initialize_app directly.
+"""
+
+import os
+import threading
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+import firebase_admin
+from firebase_admin import credentials, db
+
+# Load environment variables
+load_dotenv()
+
+# Firebase configuration
+SERVICE_ACCOUNT_KEY_PATH = 'serviceAccountKey.json'
+DATABASE_URL = os.getenv('NEXT_PUBLIC_FIREBASE_DATABASE_URL')
+
+# urllib3 defaults to 10 pooled connections; concurrent reads beyond that
+# queue behind each other. Size the pool for the expected concurrency
+# (overridable via FIREBASE_POOL_SIZE).
+FIREBASE_POOL_SIZE = int(os.getenv('FIREBASE_POOL_SIZE', '32'))
+
+
+def _tune_connection_pool(app):
+    """Resize the urllib3 pool behind the RTDB client's requests.Session."""
+    try:
+        session = db.reference('/', app=app)._client.session
+        session.mount('https://', HTTPAdapter(
+            pool_connections=FIREBASE_POOL_SIZE,
+            pool_maxsize=FIREBASE_POOL_SIZE,
+            pool_block=False
+        ))
+    except AttributeError:
+        # The session lives behind private SDK attributes; if an SDK upgrade
+        # moves it, fall back to the default pool rather than failing init.
+        print("⚠️ Could not tune the Firebase connection pool; using SDK defaults")
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    """Return the shared Firebase app, initializing it on first use."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            if not os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
+                raise FileNotFoundError(
+                    f"Service account key file not found at '{SERVICE_ACCOUNT_KEY_PATH}'. "
+                    "Please download it from your Firebase project settings and "
+                    "place it in the project root."
+                )
+            if not DATABASE_URL:
+                raise ValueError(
+                    "NEXT_PUBLIC_FIREBASE_DATABASE_URL is not set in your .env file."
+                )
+            # Safety net: another code path may already have initialized the app.
+            if firebase_admin._apps:
+                _app = firebase_admin.get_app()
+            else:
+                cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
+                _app = firebase_admin.initialize_app(cred, {
+                    'databaseURL': DATABASE_URL
+                })
+            _tune_connection_pool(_app)
+        return _app
+
+
+def get_db_ref(path='/'):
+    """Return a database Reference at `path`, bound to the shared app."""
+    return db.reference(path, app=get_app())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Async Realtime Database REST client.
+
+firebase_admin's database client is synchronous: every get/set/update blocks
+its thread for a full round-trip. This thin aiohttp wrapper lets one event
+loop keep many requests in flight over a shared connection pool, which is
+what allows a single process to drive several ports concurrently. Auth
+tokens are minted from the shared admin credential in firebase_client and
+refreshed shortly before they expire.
+"""
+
+import time
+import calendar
+import aiohttp
+
+from firebase_client import DATABASE_URL, get_app
+
+# Mint a fresh OAuth token this many seconds before the current one expires.
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+class AsyncRTDBClient:
+    """Async RTDB REST operations over one pooled aiohttp session.
+
+    Use as an async context manager so the session is closed on exit:
+
+        async with AsyncRTDBClient() as client:
+            await client.patch('ports/port_3', {'currentSessionId': None})
+    """
+
+    def __init__(self, connection_limit=32):
+        self._connection_limit = connection_limit
+        self._session = None
+        self._token = None
+        self._token_expiry = 0.0
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self._connection_limit)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+
+    def _auth_headers(self):
+        # Minting a token is blocking I/O, but it only happens about once an
+        # hour; not worth pushing to an executor.
+        if self._token is None or time.time() > self._token_expiry - TOKEN_REFRESH_MARGIN_SECONDS:
+            access_info = get_app().credential.get_access_token()
+            self._token = access_info.access_token
+            expiry = access_info.expiry
+            if expiry.tzinfo is None:
+                # google-auth hands back naive UTC datetimes.
+                self._token_expiry = calendar.timegm(expiry.utctimetuple())
+            else:
+                self._token_expiry = expiry.timestamp()
+        return {'Authorization': f'Bearer {self._token}'}
+
+    def _url(self, path):
+        return f"{DATABASE_URL}/{path.strip('/')}.json"
+
+    async def get(self, path):
+        """Read the value at `path`."""
+        async with self._session.get(self._url(path), headers=self._auth_headers()) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def put(self, path, value):
+        """Overwrite the value at `path` (REST equivalent of set())."""
+        async with self._session.put(
+            self._url(path), json=value, headers=self._auth_headers()
+        ) as resp:
+            resp.raise_for_status()
+
+    async def patch(self, path, value, compress=False):
+        """Merge `value` into `path` (REST equivalent of update()).
+
+        Slashes in keys of `value` are treated as deep paths, so one PATCH
+        can carry a multi-path update. `compress=True` gzips the body, which
+        pays off for large, repetitive batches.
+        """
+        async with self._session.patch(
+            self._url(path),
+            json=value,
+            headers=self._auth_headers(),
+            compress='gzip' if compress else None
+        ) as resp:
+            resp.raise_for_status()
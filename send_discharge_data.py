@@ -5,115 +5,316 @@ Send sample discharging data for testing.
 
 import os
 import time
-import random
-from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, db
+import queue
+import asyncio
+import logging
+import logging.handlers
 
-def main():
+import numpy as np
+
+from firebase_client import get_app
+from rtdb_async import AsyncRTDBClient
+
+# Log records pass through a bounded queue drained by a background thread, so
+# a blocked stdout (e.g. a slow pipe) never stalls the sampling loop. The
+# maxsize gives back-pressure if the consumer falls far behind.
+LOG_QUEUE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _setup_deferred_logging():
+    """Route records through a queue to a background writer; return the listener."""
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    listener.start()
+    return listener
+
+# Seconds between samples (overridable via SAMPLE_PERIOD_SECONDS). The loop
+# schedules against absolute monotonic deadlines rather than sleeping a fixed
+# amount after each tick, so per-tick work doesn't stretch the sample grid.
+SAMPLE_PERIOD_SECONDS = float(os.getenv('SAMPLE_PERIOD_SECONDS', '5'))
+
+# Simulated samples are pre-generated in vectorized batches: one NumPy call
+# replaces SAMPLE_BATCH_SIZE interpreter round-trips through the random
+# module. float32 buffers halve the memory of the batch.
+SAMPLE_BATCH_SIZE = 1024
+
+
+def _generate_sample_batch(rng):
+    """Return (voltage, current) buffers of SAMPLE_BATCH_SIZE discharge samples."""
+    volt_buf = np.round(rng.uniform(3.2, 4.1, size=SAMPLE_BATCH_SIZE), 2).astype(np.float32)
+    curr_buf = np.round(rng.uniform(-2.0, -0.5, size=SAMPLE_BATCH_SIZE), 2).astype(np.float32)
+    return volt_buf, curr_buf
+
+# --- Buffered log writer ---
+# Log entries are buffered locally and flushed in one multi-path update every
+# FLUSH_INTERVAL_SECONDS, so the sampling loop never blocks on a network
+# round-trip. MAX_PENDING_LOGS provides back-pressure: if the flusher falls
+# behind (e.g. network outage), the sampling loop blocks instead of growing
+# the buffer without bound.
+FLUSH_INTERVAL_SECONDS = 5.0
+MAX_PENDING_LOGS = 200
+
+# Touch a tiny node this often so the HTTPS connection never idles long
+# enough for the server to tear it down; reconnecting costs a full TLS
+# handshake on the next flush.
+KEEPALIVE_INTERVAL_SECONDS = 20
+
+pending_logs = {}
+pending_live_stats = {}
+_buffer_slots = asyncio.Semaphore(MAX_PENDING_LOGS)
+_shutdown = asyncio.Event()
+
+
+async def queue_log(log_path, log_entry, voltage, current):
+    """Buffer a log entry (keyed by its deep path under the session) and the
+    latest live stats for the next flush."""
+    await _buffer_slots.acquire()
+    pending_logs[log_path] = log_entry
+    pending_live_stats['currentVoltage'] = voltage
+    pending_live_stats['currentCurrent'] = current
+
+
+async def flush_pending(client, session_path):
+    """Send all buffered logs and live stats in a single multi-path update.
+
+    On failure the batch is merged back into the buffers (without clobbering
+    entries queued while the request was in flight) and the exception
+    propagates; buffer slots are only released for entries that were actually
+    sent, so back-pressure stays accurate either way.
+    """
+    if not pending_logs and not pending_live_stats:
+        return
+    batch_logs = dict(pending_logs)
+    batch_stats = dict(pending_live_stats)
+    updates = dict(batch_logs)
+    updates.update(batch_stats)
+    pending_logs.clear()
+    pending_live_stats.clear()
+    try:
+        await client.patch(session_path, updates)
+    except Exception:
+        # Re-queue the batch for the next flush. Entries queued during the
+        # failed request win on key collisions (they are newer), and live
+        # stats are only restored if nothing fresher arrived meanwhile.
+        batch_logs.update(pending_logs)
+        pending_logs.clear()
+        pending_logs.update(batch_logs)
+        if not pending_live_stats:
+            pending_live_stats.update(batch_stats)
+        raise
+    for _ in range(len(batch_logs)):
+        _buffer_slots.release()
+
+
+# Bulk backfill (e.g. samples buffered on the device during a network outage)
+# sends gzipped PATCH batches of up to this many entries each.
+BACKFILL_BATCH_SIZE = 500
+
+
+async def backfill_logs(client, session_path, buffered_logs):
+    """
+    Bulk-upload buffered log entries for the session at `session_path`
+    (e.g. 'ports/port_3/sessions/discharge_session_123').
+
+    `buffered_logs` maps keys relative to the session's logs node — the same
+    'bucket/timestamp' shape the live loop writes — to packed entries. The
+    entries are sent as gzipped PATCH requests of at most BACKFILL_BATCH_SIZE
+    each, so a long outage costs a handful of round-trips instead of one per
+    sample.
+    """
+    items = list(buffered_logs.items())
+    for start in range(0, len(items), BACKFILL_BATCH_SIZE):
+        batch = dict(items[start:start + BACKFILL_BATCH_SIZE])
+        await client.patch(f'{session_path}/logs', batch, compress=True)
+
+
+async def _flush_loop(client, session_path):
+    """Background task: flush the buffer every FLUSH_INTERVAL_SECONDS."""
+    while not _shutdown.is_set():
+        try:
+            await asyncio.wait_for(_shutdown.wait(), FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            try:
+                await flush_pending(client, session_path)
+            except Exception as e:
+                # Transient failure: the batch was re-queued by flush_pending,
+                # so just try again next interval instead of dying (which
+                # would deadlock the sampling loop once the buffer fills).
+                logger.warning(f"Flush failed, will retry: {e}")
+
+
+async def _keepalive_loop(client, path):
+    """Background task: issue a tiny read to keep the connection warm.
+
+    Reads the port's currentSessionId scalar — any small node does the job.
+    """
+    while not _shutdown.is_set():
+        try:
+            await asyncio.wait_for(_shutdown.wait(), KEEPALIVE_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            try:
+                await client.get(path)
+            except Exception:
+                # Best effort: a failed ping just means the next flush reconnects.
+                pass
+
+
+async def main():
     """
     Sends sample discharging data for port_3 to the Firebase Realtime Database.
     """
-    # --- Configuration ---
-    # Load environment variables from .env file
-    load_dotenv()
-
-    # Path to your Firebase service account key file
-    # Ensure this file is in your project root and named serviceAccountKey.json
-    SERVICE_ACCOUNT_KEY_PATH = 'serviceAccountKey.json'
-    DATABASE_URL = os.getenv('NEXT_PUBLIC_FIREBASE_DATABASE_URL')
-
-    if not os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
-        print(f"Error: Service account key file not found at '{SERVICE_ACCOUNT_KEY_PATH}'")
-        print("Please download it from your Firebase project settings and place it in the project root.")
-        return
-        
-    if not DATABASE_URL:
-        print("Error: NEXT_PUBLIC_FIREBASE_DATABASE_URL is not set in your .env file.")
-        return
+    # --- Logging ---
+    # Stdout writes happen on the listener thread, not in the sampling loop.
+    log_listener = _setup_deferred_logging()
 
     # --- Firebase Initialization ---
+    # The shared firebase_client module loads .env, validates the service
+    # account key and initializes the app exactly once per process; the async
+    # client mints its REST tokens from the same credential.
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        # Check if the app is already initialized to prevent errors on re-runs
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': DATABASE_URL
-            })
-        print("Successfully initialized Firebase Admin SDK.")
+        get_app()
+        logger.info("Successfully initialized Firebase Admin SDK.")
     except Exception as e:
-        print(f"Error initializing Firebase Admin SDK: {e}")
+        logger.error(f"Error initializing Firebase Admin SDK: {e}")
         return
 
     # --- Data Simulation ---
     port_id = "port_3"
-    port_ref = db.reference(f'ports/{port_id}')
-    print(f"Targeting port: {port_id}")
-
-    # 1. Create a new discharging session
-    start_timestamp = int(time.time() * 1000)
-    session_id = f"discharge_session_{start_timestamp}"
-    session_ref = port_ref.child('sessions').child(session_id)
-
-    session_data = {
-        'startTime': start_timestamp,
-        'endTime': None,
-        'status': 'discharging',
-        'type': 'discharging',  # Current battery state: charging, discharging, or resting
-        'batteryType': 'LiPo',
-        'ratedCapacity': 2.2,  # 2.2 Ah rated capacity
-        'currentVoltage': 0.0,
-        'currentCurrent': 0.0,
-        'logs': {}
-    }
-    session_ref.set(session_data)
-    print(f"Created new discharging session: {session_id}")
-
-    # 2. Set this new session as the current session for the port
-    port_ref.update({
-        'name': 'Port 3',
-        'currentSessionId': session_id
-    })
-    print(f"Set '{session_id}' as the current session for {port_id}.")
-
-    # 3. Send log entries to simulate discharging
-    print(f"Simulating live discharging data for '{port_id}'. Press Ctrl+C to stop.")
-    try:
-        while True:
-            # During discharge, voltage decreases and current is negative
-            voltage = round(random.uniform(3.2, 4.1), 2)
-            current = round(random.uniform(-2.0, -0.5), 2)  # Negative for discharging
-            log_timestamp = int(time.time() * 1000)
-            
-            # Update the 'live' stats in the session
-            session_ref.update({
-                'currentVoltage': voltage,
-                'currentCurrent': current
-            })
+    port_path = f'ports/{port_id}'
+    logger.info(f"Targeting port: {port_id}")
 
-            # Add a new log entry
-            log_entry = {
-                'voltage': voltage,
-                'current': current,
-                'cycle': 'discharging'
-            }
-            session_ref.child('logs').child(str(log_timestamp)).set(log_entry)
-            
-            print(f"[{time.strftime('%H:%M:%S')}] Sent -> V: {voltage}V | A: {current}A (discharging)")
-            time.sleep(5)
-            
-    except KeyboardInterrupt:
-        # 4. Mark the session as completed on exit
-        end_time = int(time.time() * 1000)
-        session_ref.update({
-            'status': 'completed',
-            'endTime': end_time,
-            'type': 'discharging'  # Preserve the type field for capacity calculation
+    async with AsyncRTDBClient() as client:
+        # 1. Create a new discharging session
+        start_timestamp = int(time.time() * 1000)
+        session_id = f"discharge_session_{start_timestamp}"
+        session_path = f'{port_path}/sessions/{session_id}'
+
+        session_data = {
+            'startTime': start_timestamp,
+            'endTime': None,
+            'status': 'discharging',
+            'type': 'discharging',  # Current battery state: charging, discharging, or resting
+            'cycle': 'discharging',  # Recorded once here; log entries no longer repeat it
+            'logScale': 100,  # Log samples are integer [centivolts, centiamps]; divide by this
+            'batteryType': 'LiPo',
+            'ratedCapacity': 2.2,  # 2.2 Ah rated capacity
+            'currentVoltage': 0.0,
+            'currentCurrent': 0.0,
+            'logs': {}
+        }
+        await client.put(session_path, session_data)
+        logger.info(f"Created new discharging session: {session_id}")
+
+        # 2. Set this new session as the current session for the port
+        await client.patch(port_path, {
+            'name': 'Port 3',
+            'currentSessionId': session_id
         })
-        # Clear the current session for the port
-        port_ref.update({'currentSessionId': None})
-        print(f"\nDischarging simulation complete. Session '{session_id}' marked as 'completed'.")
+        logger.info(f"Set '{session_id}' as the current session for {port_id}.")
+
+        # 3. Start the background tasks, then send log entries to simulate
+        # discharging. Entries are buffered and written in batches off the
+        # hot path; the event loop overlaps the flush with the tick sleeps.
+        flusher = asyncio.create_task(_flush_loop(client, session_path))
+        keepalive = asyncio.create_task(
+            _keepalive_loop(client, f'{port_path}/currentSessionId')
+        )
+
+        logger.info(f"Simulating live discharging data for '{port_id}'. Press Ctrl+C to stop.")
+
+        # Fill the first sample buffers up front; the loop just pops from them
+        # and refills when exhausted.
+        rng = np.random.default_rng()
+        volt_buf, curr_buf = _generate_sample_batch(rng)
+        sample_idx = 0
+
+        # The hourly bucket prefix only changes at the top of the hour; cache
+        # it so the common case builds the log path with one concatenation
+        # instead of a strftime plus f-string per tick.
+        bucket_hour = None
+        bucket_prefix = ''
+
+        next_deadline = time.monotonic()
+
+        try:
+            while True:
+                if sample_idx == SAMPLE_BATCH_SIZE:
+                    volt_buf, curr_buf = _generate_sample_batch(rng)
+                    sample_idx = 0
+
+                # During discharge, voltage decreases and current is negative.
+                # Re-round after the float32 round-trip so the wire values stay
+                # clean 2-decimal numbers.
+                voltage = round(float(volt_buf[sample_idx]), 2)
+                current = round(float(curr_buf[sample_idx]), 2)
+                sample_idx += 1
+
+                # One clock read per tick; the log timestamp and the printed
+                # wall-clock string are both derived from it.
+                now = time.time()
+                log_timestamp = int(now * 1000)
+
+                # Buffer the log entry; the flusher task periodically sends the
+                # live stats and all pending logs in a single multi-path update
+                # (RTDB treats slashes in update keys as deep paths). Logs are
+                # sharded into hourly buckets so no node ever accumulates more
+                # than ~3600 direct children — listeners on logs/ pay per
+                # sibling. Each entry is a packed [voltage, current] pair; the
+                # constant 'cycle' lives once on the session, cutting per-log
+                # JSON roughly in half. Samples are quantized to integer
+                # centivolts/centiamps (the session's 'logScale') — precision
+                # is 0.01 anyway, and ints serialize smaller than 2-decimal
+                # floats.
+                log_entry = [int(round(voltage * 100)), int(round(current * 100))]
+                hour = int(now // 3600)
+                if hour != bucket_hour:
+                    bucket_hour = hour
+                    bucket_prefix = time.strftime('logs/%Y%m%d_%H/', time.gmtime(now))
+                await queue_log(bucket_prefix + str(log_timestamp), log_entry, voltage, current)
+
+                ts_str = time.strftime('%H:%M:%S', time.localtime(now))
+                logger.info(f"[{ts_str}] Sent -> V: {voltage}V | A: {current}A (discharging)")
+
+                # Sleep until the next absolute deadline so the cadence stays
+                # stable regardless of how long this tick took.
+                next_deadline += SAMPLE_PERIOD_SECONDS
+                await asyncio.sleep(max(0.0, next_deadline - time.monotonic()))
+
+        except asyncio.CancelledError:
+            # 4. Ctrl+C cancels this task via asyncio.run. Stop the background
+            # tasks and drain any buffered logs before marking the session as
+            # completed on exit.
+            _shutdown.set()
+            # return_exceptions: a task that died on an error must not skip
+            # the session finalization below.
+            await asyncio.gather(flusher, keepalive, return_exceptions=True)
+            try:
+                await flush_pending(client, session_path)
+            except Exception as e:
+                logger.warning(f"Final flush failed, dropping {len(pending_logs)} buffered logs: {e}")
+
+            end_time = int(time.time() * 1000)
+            await client.patch(session_path, {
+                'status': 'completed',
+                'endTime': end_time,
+                'type': 'discharging'  # Preserve the type field for capacity calculation
+            })
+            # Clear the current session for the port
+            await client.patch(port_path, {'currentSessionId': None})
+            logger.info(f"\nDischarging simulation complete. Session '{session_id}' marked as 'completed'.")
+            log_listener.stop()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # The session was already finalized by the CancelledError handler.
+        pass
@@ -20,12 +20,12 @@ import {
 import { Button } from '@/components/ui/button';
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { Input } from '@/components/ui/input';
-import type { Session, LogEntry } from '@/types';
+import type { Session, SessionLogs } from '@/types';
 import { Badge } from '@/components/ui/badge';
 import { LiveChart } from './live-chart';
 import { Download, AlertTriangle, Save, Edit, Battery } from 'lucide-react';
 import { useToast } from '@/hooks/use-toast';
-import { updateBackupBatteryCapacity } from '@/lib/utils';
+import { updateBackupBatteryCapacity, normalizeSessionLogs } from '@/lib/utils';
 import { ref, update } from 'firebase/database';
 import { database } from '@/lib/firebase';
 
@@ -64,7 +64,7 @@ const getSessionStartTime = (session: Session, sessionId: string): number | null
   };
 
 // Function to generate a high-quality chart image using canvas
-const generateChartImage = (logs: Record<string, LogEntry> | undefined): string | null => {
+const generateChartImage = (logs: SessionLogs | undefined, logScale?: number): string | null => {
   if (!logs || Object.keys(logs).length === 0) return null;
 
   try {
@@ -91,7 +91,7 @@ const generateChartImage = (logs: Record<string, LogEntry> | undefined): string
     ctx.strokeRect(0, 0, 400, 250);
 
     // Process data
-    const logData = Object.entries(logs)
+    const logData = Object.entries(normalizeSessionLogs(logs, { logScale }))
       .map(([timestamp, values]) => ({
         timestamp: parseInt(timestamp, 10),
         voltage: Number(values.voltage),
@@ -402,7 +402,7 @@ export function HistoryModal({ isOpen, onClose, sessions, portName }: HistoryMod
     // Generate high-quality chart image if logs exist
     if (session.logs && Object.keys(session.logs).length > 0) {
         try {
-            const chartImageData = generateChartImage(session.logs);
+            const chartImageData = generateChartImage(session.logs, session.logScale);
             if (chartImageData) {
                 const imgProps = doc.getImageProperties(chartImageData);
                 const pdfWidth = doc.internal.pageSize.getWidth();
@@ -422,7 +422,7 @@ export function HistoryModal({ isOpen, onClose, sessions, portName }: HistoryMod
     const tableColumn = ["Timestamp", "Voltage (V)", "Current (A)", "Cycle"];
     const tableRows: (string | number)[][] = [];
 
-    const logData = Object.entries(session.logs || {})
+    const logData = Object.entries(normalizeSessionLogs(session.logs, { cycle: session.cycle, logScale: session.logScale }))
       .map(([timestamp, values]) => ({
           timestamp: parseInt(timestamp, 10),
           ...values
@@ -600,7 +600,7 @@ export function HistoryModal({ isOpen, onClose, sessions, portName }: HistoryMod
                       )}
                       <div ref={(el) => { chartRefs.current[session.id] = el; }} className="w-full overflow-x-auto">
                           <div className="min-w-[500px]">
-                              <LiveChart data={session.logs} />
+                              <LiveChart data={session.logs} logScale={session.logScale} />
                           </div>
                       </div>
                       <div className="flex justify-end">
@@ -2,14 +2,15 @@
 
 import { useMemo, useState, useEffect, memo } from 'react';
 import { Line, LineChart, CartesianGrid, XAxis, YAxis } from 'recharts';
-import type { LogEntry } from '@/types';
+import type { SessionLogs } from '@/types';
 import { ChartContainer, ChartTooltip, ChartTooltipContent, ChartLegend, ChartLegendContent } from "@/components/ui/chart";
 import { ChartConfig } from '@/components/ui/chart';
-import { calculateSOC, getCutoffVoltage } from '@/lib/utils';
+import { calculateSOC, getCutoffVoltage, normalizeSessionLogs } from '@/lib/utils';
 
 interface LiveChartProps {
-  data: Record<string, LogEntry> | undefined;
+  data: SessionLogs | undefined;
   batteryType?: string;
+  logScale?: number;
 }
 
 const chartConfig = {
@@ -27,7 +28,7 @@ const chartConfig = {
   },
 } satisfies ChartConfig;
   
-export const LiveChart = memo(function LiveChart({ data, batteryType }: LiveChartProps) {
+export const LiveChart = memo(function LiveChart({ data, batteryType, logScale }: LiveChartProps) {
     const [isClient, setIsClient] = useState(false);
 
     useEffect(() => {
@@ -35,9 +36,10 @@ export const LiveChart = memo(function LiveChart({ data, batteryType }: LiveChar
     }, []);
 
   const chartData = useMemo(() => {
-    if (!data || Object.keys(data).length === 0) return [];
-    
-    const entries = Object.entries(data)
+    const flatLogs = normalizeSessionLogs(data, { logScale });
+    if (Object.keys(flatLogs).length === 0) return [];
+
+    const entries = Object.entries(flatLogs)
       .map(([timestamp, values]) => ({
         timestamp: parseInt(timestamp, 10),
         voltage: Number(values.voltage),
@@ -57,7 +59,7 @@ export const LiveChart = memo(function LiveChart({ data, batteryType }: LiveChar
     }
     
     return entries;
-  }, [data, batteryType]);
+  }, [data, batteryType, logScale]);
 
   // Early return for insufficient data
   if (!isClient || chartData.length < 2) {
@@ -11,6 +11,7 @@ import {
 import { Button } from '@/components/ui/button';
 import { optimizeChargingParameters, OptimizeChargingParametersOutput } from '@/ai/flows/optimize-charging-parameters';
 import type { Session } from '@/types';
+import { normalizeSessionLogs } from '@/lib/utils';
 import { useToast } from '@/hooks/use-toast';
 import { Bot, Loader2, Sparkles } from 'lucide-react';
 
@@ -30,7 +31,7 @@ export function OptimizationModal({ isOpen, onClose, session, portName }: Optimi
     setLoading(true);
     setResult(null);
     try {
-      const historicalDataString = Object.entries(session.logs || {})
+      const historicalDataString = Object.entries(normalizeSessionLogs(session.logs, { cycle: session.cycle, logScale: session.logScale }))
         .map(([ts, data]) => `${ts},${Number(data.voltage).toFixed(4)},${Number(data.current).toFixed(4)},${data.cycle}`)
         .join('\n');
 
@@ -10,7 +10,7 @@ import { usePortData } from '@/hooks/use-port-data';
 import { LiveChart } from './live-chart';
 import { HistoryModal } from './history-modal';
 import { useToast } from '@/hooks/use-toast';
-import { calculateMeasuredCapacity, calculateSOH, getCutoffVoltage, calculateSOC, calculateDischargedCapacity, calculateRemainingCapacity, updateBackupBatteryCapacity } from '@/lib/utils';
+import { calculateMeasuredCapacity, calculateSOH, getCutoffVoltage, calculateSOC, calculateDischargedCapacity, calculateRemainingCapacity, updateBackupBatteryCapacity, normalizeSessionLogs } from '@/lib/utils';
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from '@/components/ui/tooltip';
 import { ref, update } from 'firebase/database';
 import { database } from '@/lib/firebase';
@@ -458,9 +458,10 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
                         currentSession.batteryType ? 
                           (() => {
                             try {
-                              if (!currentSession.logs || Object.keys(currentSession.logs).length < 2) return '0.00 Ah';
+                              const flatLogs = normalizeSessionLogs(currentSession.logs, { logScale: currentSession.logScale });
+                              if (Object.keys(flatLogs).length < 2) return '0.00 Ah';
                               // During discharge, show current discharged capacity as measured capacity
-                              const dischargedCapacity = calculateDischargedCapacity(currentSession.logs, getCutoffVoltage(currentSession.batteryType));
+                              const dischargedCapacity = calculateDischargedCapacity(flatLogs, getCutoffVoltage(currentSession.batteryType));
                               return `${dischargedCapacity.toFixed(2)} Ah`;
                             } catch (error) {
                               console.error('Error calculating measured capacity:', error);
@@ -500,9 +501,10 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
                         currentSession.batteryType ? 
                           (() => {
                             try {
-                              if (!currentSession.logs || Object.keys(currentSession.logs).length < 2) return '0%';
+                              const flatLogs = normalizeSessionLogs(currentSession.logs, { logScale: currentSession.logScale });
+                              if (Object.keys(flatLogs).length < 2) return '0%';
                               // During discharge, show projected SOH based on current discharge state
-                              const dischargedCapacity = calculateDischargedCapacity(currentSession.logs, getCutoffVoltage(currentSession.batteryType));
+                              const dischargedCapacity = calculateDischargedCapacity(flatLogs, getCutoffVoltage(currentSession.batteryType));
                               const ratedCapacity = currentSession.ratedCapacity || portData?.ratedCapacity || 0;
                               const projectedSOH = (dischargedCapacity / ratedCapacity) * 100;
                               return `${projectedSOH.toFixed(1)}%`;
@@ -547,8 +549,9 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
                   <strong className="font-mono text-lg text-blue-600">
                     {(() => {
                       try {
-                        if (!currentSession.logs || Object.keys(currentSession.logs).length < 2) return '0.000 Ah';
-                        return `${calculateDischargedCapacity(currentSession.logs, getCutoffVoltage(currentSession.batteryType)).toFixed(3)} Ah`;
+                        const flatLogs = normalizeSessionLogs(currentSession.logs, { logScale: currentSession.logScale });
+                        if (Object.keys(flatLogs).length < 2) return '0.000 Ah';
+                        return `${calculateDischargedCapacity(flatLogs, getCutoffVoltage(currentSession.batteryType)).toFixed(3)} Ah`;
                       } catch (error) {
                         console.error('Error calculating discharged capacity:', error);
                         return 'Error';
@@ -574,7 +577,7 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
                   <strong className="font-mono text-lg text-green-600">
                     {(() => {
                       try {
-                        const logs = Object.entries(currentSession.logs || {});
+                        const logs = Object.entries(normalizeSessionLogs(currentSession.logs, { logScale: currentSession.logScale }));
                         if (logs.length < 2) return '0%';
                         
                         const sortedLogs = logs
@@ -613,9 +616,10 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
                         const ratedCapacity = currentSession.ratedCapacity || portData?.ratedCapacity || 0;
                         if (ratedCapacity <= 0) return '0.00 Ah';
                         
-                        if (!currentSession.logs || Object.keys(currentSession.logs).length < 2) return '0.000 Ah';
+                        const flatLogs = normalizeSessionLogs(currentSession.logs, { logScale: currentSession.logScale });
+                        if (Object.keys(flatLogs).length < 2) return '0.000 Ah';
                         
-                        const dischargedCapacity = calculateDischargedCapacity(currentSession.logs, getCutoffVoltage(currentSession.batteryType));
+                        const dischargedCapacity = calculateDischargedCapacity(flatLogs, getCutoffVoltage(currentSession.batteryType));
                         const remainingCapacity = calculateRemainingCapacity(ratedCapacity, dischargedCapacity);
                         
                         return `${remainingCapacity.toFixed(3)} Ah`;
@@ -785,7 +789,7 @@ export const PortCard = memo(function PortCard({ portId, portName }: PortCardPro
           </div>
           <div className="w-full overflow-x-auto">
             <div className="min-w-[500px]">
-              <LiveChart data={currentSession?.logs} batteryType={currentSession?.batteryType} />
+              <LiveChart data={currentSession?.logs} batteryType={currentSession?.batteryType} logScale={currentSession?.logScale} />
             </div>
           </div>
         </CardContent>
@@ -2,8 +2,8 @@
 import { useState, useEffect, useRef, useCallback, useMemo } from 'react';
 import { ref, onValue, update } from 'firebase/database';
 import { database } from '@/lib/firebase';
-import { calculateBatteryMetrics, updateRealTimeBatteryMetrics, updateBackupBatteryCapacity, saveFinalBatteryMetrics, clearUpdateThrottle } from '@/lib/utils';
-import type { Port, Session, LogEntry } from '@/types';
+import { calculateBatteryMetrics, updateRealTimeBatteryMetrics, updateBackupBatteryCapacity, saveFinalBatteryMetrics, clearUpdateThrottle, normalizeSessionLogs } from '@/lib/utils';
+import type { Port, Session, SessionLogs } from '@/types';
 
 const STALE_SESSION_TIMEOUT = 5 * 60 * 1000; // 5 minutes
 const REAL_TIME_UPDATE_INTERVAL = 5000; // 5 seconds between real-time updates
@@ -16,7 +16,7 @@ const canCalculateFinalMetrics = (session: Session): boolean => {
     session.ratedCapacity &&
     session.ratedCapacity > 0 &&
     session.logs &&
-    Object.keys(session.logs).length >= 2
+    Object.keys(normalizeSessionLogs(session.logs)).length >= 2
   );
 };
 
@@ -46,15 +46,15 @@ export function usePortData(portId: string) {
     const ratedCapacity = currentSession.ratedCapacity || portData?.ratedCapacity || 0;
     if (ratedCapacity <= 0) return null;
     
-    return calculateBatteryMetrics(currentSession.logs, currentSession.batteryType, ratedCapacity);
-  }, [currentSession?.logs, currentSession?.batteryType, currentSession?.ratedCapacity, portData?.ratedCapacity]);
+    return calculateBatteryMetrics(currentSession.logs, currentSession.batteryType, ratedCapacity, currentSession.logScale);
+  }, [currentSession?.logs, currentSession?.batteryType, currentSession?.ratedCapacity, currentSession?.logScale, portData?.ratedCapacity]);
 
   // Enhanced debounced update function with better timing control
   const debouncedUpdate = useCallback(async (
     session: Session,
     portId: string,
     sessionId: string,
-    logs: Record<string, LogEntry>,
+    logs: SessionLogs,
     batteryType: string,
     ratedCapacity: number
   ) => {
@@ -166,15 +166,20 @@ export function usePortData(portId: string) {
           }
         }
         
+        // Flatten the logs once per snapshot: the simulator shards them into
+        // hourly buckets, so raw keys are not timestamps and the raw key
+        // count is the bucket count, not the sample count.
+        const flatLogs = normalizeSessionLogs(session.logs, { cycle: session.cycle, logScale: session.logScale });
+
         // Check if new log data arrived and update Firebase in real-time (with better control)
-        const currentLogCount = Object.keys(session.logs || {}).length;
+        const currentLogCount = Object.keys(flatLogs).length;
         if (currentLogCount > lastLogCountRef.current && currentLogCount > 1) {
           lastLogCountRef.current = currentLogCount;
-          
+
           // Only trigger update if we have sufficient data and it's been long enough
           const ratedCapacity = session.ratedCapacity || data.ratedCapacity || 0;
           if (ratedCapacity > 0 && session.batteryType) {
-            debouncedUpdate(session, portId, data.currentSessionId, session.logs, session.batteryType, ratedCapacity);
+            debouncedUpdate(session, portId, data.currentSessionId, flatLogs, session.batteryType, ratedCapacity);
           }
         }
         
@@ -184,7 +189,7 @@ export function usePortData(portId: string) {
 
         // Check for stale session - only if no recent activity
         if (session.status === 'charging' || session.status === 'discharging') {
-          const logTimestamps = session.logs ? Object.keys(session.logs).map(Number) : [];
+          const logTimestamps = Object.keys(flatLogs).map(Number);
           const lastLogTime = logTimestamps.length > 0 ? Math.max(...logTimestamps) : session.startTime;
           
           // Only close if we haven't received any logs in the timeout period
@@ -206,7 +211,7 @@ export function usePortData(portId: string) {
                   database,
                   portId,
                   data.currentSessionId,
-                  session.logs,
+                  flatLogs,
                   session.batteryType,
                   session.ratedCapacity
                 );
@@ -218,7 +223,7 @@ export function usePortData(portId: string) {
                   hasBatteryType: !!session.batteryType,
                   hasRatedCapacity: !!session.ratedCapacity,
                   ratedCapacityValue: session.ratedCapacity,
-                  logCount: session.logs ? Object.keys(session.logs).length : 0
+                  logCount: Object.keys(flatLogs).length
                 });
               }
               
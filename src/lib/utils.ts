@@ -1,12 +1,65 @@
 import { clsx, type ClassValue } from "clsx"
 import { twMerge } from "tailwind-merge"
-import type { Session, LogEntry } from "@/types"
+import type { Session, LogEntry, RawLogEntry, SessionLogs } from "@/types"
 import { ref, update, get } from "firebase/database"
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
 
+/**
+ * Normalize raw session logs into a flat timestamp -> LogEntry map.
+ *
+ * The discharge simulator shards logs into hourly buckets
+ * (logs/{YYYYMMDD_HH}/{timestamp}) and writes packed [voltage, current]
+ * pairs with the cycle recorded once at session level; older sessions and
+ * the ESP32 bridge store a flat map of full {voltage, current, cycle}
+ * objects. Consumers normalize first and then work with LogEntry either way.
+ *
+ * @param logs - Raw logs as stored in Firebase
+ * @param options - cycle: value for packed entries (default 'discharging');
+ *                  logScale: divisor for packed entries (the session's
+ *                  logScale field, e.g. 100 for centivolts/centiamps)
+ * @returns Flat map of timestamp string -> LogEntry, in volts/amps
+ */
+export function normalizeSessionLogs(
+  logs: SessionLogs | undefined,
+  options: { cycle?: LogEntry['cycle']; logScale?: number } = {}
+): Record<string, LogEntry> {
+  const flat: Record<string, LogEntry> = {};
+  if (!logs) return flat;
+
+  const cycle = options.cycle || 'discharging';
+  const logScale = options.logScale && options.logScale > 0 ? options.logScale : 1;
+
+  const addEntry = (timestamp: string, value: RawLogEntry) => {
+    if (Array.isArray(value)) {
+      flat[timestamp] = {
+        voltage: Number(value[0]) / logScale,
+        current: Number(value[1]) / logScale,
+        cycle
+      };
+    } else if (value && typeof value === 'object') {
+      flat[timestamp] = value;
+    }
+  };
+
+  Object.entries(logs).forEach(([key, value]) => {
+    if (/^\d+$/.test(key)) {
+      // Flat schema: the key is a millisecond timestamp.
+      addEntry(key, value as RawLogEntry);
+    } else if (value && typeof value === 'object' && !Array.isArray(value)) {
+      // Bucketed schema: the key is an hourly bucket (e.g. "20250831_14")
+      // holding one {timestamp: entry} level.
+      Object.entries(value as Record<string, RawLogEntry>).forEach(
+        ([timestamp, entry]) => addEntry(timestamp, entry)
+      );
+    }
+  });
+
+  return flat;
+}
+
 /**
  * Calculate measured capacity by integrating current over time during discharge
  * @param session - The session containing logs
@@ -14,15 +67,17 @@ export function cn(...inputs: ClassValue[]) {
  * @returns Measured capacity in Ah, or 0 if not a valid discharge session
  */
 export function calculateMeasuredCapacity(session: Session, cutoffVoltage: number = 3.0): number {
+  const logs = normalizeSessionLogs(session.logs, { cycle: session.cycle, logScale: session.logScale });
+
   console.log('🔋 Capacity calculation started for session:', {
     sessionId: session.startTime,
     sessionType: session.type,
-    logsCount: Object.keys(session.logs || {}).length,
+    logsCount: Object.keys(logs).length,
     cutoffVoltage: cutoffVoltage
   });
 
   // Basic validation
-  if (!session.logs || Object.keys(session.logs).length === 0) {
+  if (Object.keys(logs).length === 0) {
     console.log('❌ No logs found for session');
     return 0;
   }
@@ -41,7 +96,7 @@ export function calculateMeasuredCapacity(session: Session, cutoffVoltage: numbe
     }> = [];
 
     // Process each log entry
-    Object.entries(session.logs).forEach(([timestampStr, logData]) => {
+    Object.entries(logs).forEach(([timestampStr, logData]) => {
       // Parse timestamp
       const timestamp = parseInt(timestampStr);
       if (isNaN(timestamp)) {
@@ -238,14 +293,16 @@ export function calculateSOC(currentVoltage: number, startVoltage: number, cutof
  * Calculate real-time discharged capacity during discharge
  * @param logs - Session logs up to current time
  * @param cutoffVoltage - Cutoff voltage to stop calculation
+ * @param logScale - Divisor for packed log entries (session's logScale field)
  * @returns Discharged capacity in Ah
  */
-export function calculateDischargedCapacity(logs: Record<string, LogEntry>, cutoffVoltage: number = 3.0): number {
-  if (!logs || Object.keys(logs).length < 2) return 0;
+export function calculateDischargedCapacity(logs: SessionLogs, cutoffVoltage: number = 3.0, logScale?: number): number {
+  const flatLogs = normalizeSessionLogs(logs, { logScale });
+  if (Object.keys(flatLogs).length < 2) return 0;
 
   try {
     // Parse and sort log entries
-    const logEntries = Object.entries(logs)
+    const logEntries = Object.entries(flatLogs)
       .map(([timestampStr, logData]) => ({
         timestamp: parseInt(timestampStr),
         voltage: Number(logData.voltage),
@@ -310,14 +367,18 @@ export function calculateRemainingCapacity(totalCapacity: number, dischargedCapa
  * @param logs - Current session logs
  * @param batteryType - Battery type for cutoff voltage
  * @param ratedCapacity - Rated capacity in Ah
+ * @param logScale - Divisor for packed log entries (session's logScale field)
  * @returns Object with all calculated metrics
  */
 export function calculateBatteryMetrics(
-  logs: Record<string, LogEntry>, 
-  batteryType: string | undefined, 
-  ratedCapacity: number
+  logs: SessionLogs,
+  batteryType: string | undefined,
+  ratedCapacity: number,
+  logScale?: number
 ) {
-  if (!batteryType || !logs || Object.keys(logs).length < 2) {
+  const flatLogs = normalizeSessionLogs(logs, { logScale });
+
+  if (!batteryType || Object.keys(flatLogs).length < 2) {
     return {
       dischargedCapacity: 0,
       soc: 0,
@@ -328,10 +389,10 @@ export function calculateBatteryMetrics(
   }
 
   const cutoffVoltage = getCutoffVoltage(batteryType);
-  const dischargedCapacity = calculateDischargedCapacity(logs, cutoffVoltage);
-  
+  const dischargedCapacity = calculateDischargedCapacity(flatLogs, cutoffVoltage);
+
   // Calculate SOC
-  const logEntries = Object.entries(logs)
+  const logEntries = Object.entries(flatLogs)
     .map(([ts, data]) => ({ timestamp: parseInt(ts), voltage: Number(data.voltage) }))
     .sort((a, b) => a.timestamp - b.timestamp);
   
@@ -365,22 +426,26 @@ export function calculateBatteryMetrics(
  * @param logs - Final session logs
  * @param batteryType - Battery type
  * @param ratedCapacity - Rated capacity
+ * @param logScale - Divisor for packed log entries (session's logScale field)
  * @returns Promise that resolves when save is complete
  */
 export async function saveFinalBatteryMetrics(
   database: any,
   portId: string,
   sessionId: string,
-  logs: Record<string, LogEntry>,
+  logs: SessionLogs,
   batteryType: string,
-  ratedCapacity: number
+  ratedCapacity: number,
+  logScale?: number
 ): Promise<void> {
   try {
+    const flatLogs = normalizeSessionLogs(logs, { logScale });
+
     // Calculate final metrics
-    const metrics = calculateBatteryMetrics(logs, batteryType, ratedCapacity);
-    
+    const metrics = calculateBatteryMetrics(flatLogs, batteryType, ratedCapacity);
+
     // Get final voltage and current
-    const logEntries = Object.entries(logs)
+    const logEntries = Object.entries(flatLogs)
       .map(([ts, data]) => ({ 
         timestamp: parseInt(ts), 
         voltage: Number(data.voltage),
@@ -435,14 +500,16 @@ const THROTTLE_INTERVAL = 3000; // 3 seconds between updates for the same sessio
  * @param logs - Session logs
  * @param batteryType - Battery type
  * @param ratedCapacity - Rated capacity in Ah
+ * @param logScale - Divisor for packed log entries (session's logScale field)
  */
 export async function updateRealTimeBatteryMetrics(
   database: any,
   portId: string,
   sessionId: string,
-  logs: Record<string, LogEntry>,
+  logs: SessionLogs,
   batteryType: string,
-  ratedCapacity: number
+  ratedCapacity: number,
+  logScale?: number
 ): Promise<void> {
   try {
     // Throttle updates for the same session
@@ -459,7 +526,7 @@ export async function updateRealTimeBatteryMetrics(
     updateThrottleMap.set(throttleKey, now);
     
     // Calculate current metrics
-    const metrics = calculateBatteryMetrics(logs, batteryType, ratedCapacity);
+    const metrics = calculateBatteryMetrics(logs, batteryType, ratedCapacity, logScale);
     
     // Update session with real-time metrics
     const sessionRef = ref(database, `ports/${portId}/sessions/${sessionId}`);
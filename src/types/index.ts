@@ -4,6 +4,17 @@ export interface LogEntry {
   cycle: 'charging' | 'discharging';
 }
 
+// A log sample as stored in Firebase: the web UI and ESP32 bridge write full
+// LogEntry objects, while the discharge simulator writes packed
+// [voltage, current] pairs with the cycle recorded once at session level.
+// Use normalizeSessionLogs() from lib/utils to read either form.
+export type RawLogEntry = LogEntry | [number, number];
+
+// Session logs as stored in Firebase: either a flat {timestamp: entry} map
+// (web UI / ESP32 bridge) or hourly buckets {YYYYMMDD_HH: {timestamp: entry}}
+// written by the simulator to cap sibling counts under logs/.
+export type SessionLogs = Record<string, RawLogEntry | Record<string, RawLogEntry>>;
+
 export interface RealTimeMetrics {
   dischargedCapacity: number; // Ah
   soc: number; // State of Charge percentage
@@ -22,9 +33,11 @@ export interface Session {
   endTime: number | null;
   status: 'charging' | 'discharging' | 'completed' | 'error';
   type: 'charging' | 'discharging' | 'resting'; // Current battery state
+  cycle?: 'charging' | 'discharging'; // Cycle for packed log entries (recorded once per session)
+  logScale?: number; // Packed log entries store value * logScale (e.g. 100 -> centivolts/centiamps)
   batteryType: string;
   ratedCapacity: number; // Rated capacity in Ah
-  logs: Record<string, LogEntry>;
+  logs: SessionLogs;
   currentVoltage: number;
   currentCurrent: number;
   notes?: string;